@@ -8,57 +8,114 @@
 
 """Flask application configuration."""
 
-import copy
+import functools
 import json
 import os
 import re
+import sys
+from types import MappingProxyType
 
-from distutils.util import strtobool
 from limits.util import parse
-from invenio_app.config import APP_DEFAULT_SECURE_HEADERS
-from invenio_oauthclient.contrib import cern_openid
-from reana_commons.config import REANA_INFRASTRUCTURE_COMPONENTS_HOSTNAMES
-from reana_commons.job_utils import kubernetes_memory_to_bytes
 
-# This database URI import is necessary for Invenio-DB
-from reana_db.config import SQLALCHEMY_DATABASE_URI
+_STRTOBOOL = {
+    "y": True,
+    "yes": True,
+    "t": True,
+    "true": True,
+    "on": True,
+    "1": True,
+    "n": False,
+    "no": False,
+    "f": False,
+    "false": False,
+    "off": False,
+    "0": False,
+}
+"""Mapping of truthy/falsy strings, replacing the deprecated ``distutils.util.strtobool``."""
+
+
+def _strtobool(value: str) -> bool:
+    """Convert a truthy/falsy string to a boolean."""
+    return _STRTOBOOL[value.lower()]
+
+
+_ENV = os.environ.copy()
+"""Snapshot of the process environment, taken once at import time."""
+
+
+def _env(name, default=None, cast=str):
+    """Return a typed configuration value from the environment snapshot.
+
+    Values are resolved against the single ``_ENV`` snapshot instead of
+    hitting ``os.getenv`` (and thus libc) once per configuration constant.
+    """
+    value = _ENV.get(name)
+    if value is None:
+        return default
+    return cast(value)
+
 
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 """Track modifications flag."""
 
 ADMIN_USER_ID = "00000000-0000-0000-0000-000000000000"
 
-SHARED_VOLUME_PATH = os.getenv("SHARED_VOLUME_PATH", "/var/reana")
+SHARED_VOLUME_PATH = _env("SHARED_VOLUME_PATH", "/var/reana")
+
+REANA_HOSTNAME = _env("REANA_HOSTNAME")
+
+REANA_SSO_CERN_CONSUMER_KEY = _env("CERN_CONSUMER_KEY", "CHANGE_ME")
 
-REANA_HOSTNAME = os.getenv("REANA_HOSTNAME")
+REANA_SSO_CERN_CONSUMER_SECRET = _env("CERN_CONSUMER_SECRET", "CHANGE_ME")
+
+_MEMORY_SUFFIXES = {
+    "Ki": 1024,
+    "Mi": 1024**2,
+    "Gi": 1024**3,
+    "Ti": 1024**4,
+    "K": 1000,
+    "M": 1000**2,
+    "G": 1000**3,
+    "T": 1000**4,
+}
+"""Kubernetes memory suffixes and their multipliers in bytes."""
 
-REANA_SSO_CERN_CONSUMER_KEY = os.getenv("CERN_CONSUMER_KEY", "CHANGE_ME")
+_MEMORY_REGEX = re.compile(r"^(\d+(?:\.\d+)?)([KMGT]i?)?$")
+"""Regex matching Kubernetes memory quantities, e.g. ``8Gi`` or ``1024``."""
 
-REANA_SSO_CERN_CONSUMER_SECRET = os.getenv("CERN_CONSUMER_SECRET", "CHANGE_ME")
 
-REANA_KUBERNETES_JOBS_MEMORY_LIMIT = os.getenv("REANA_KUBERNETES_JOBS_MEMORY_LIMIT")
+def _kubernetes_memory_to_bytes(memory: str) -> int:
+    """Convert a Kubernetes memory quantity (e.g. ``8Gi``) to bytes."""
+    match = _MEMORY_REGEX.match(memory)
+    if not match:
+        raise ValueError(f'Invalid Kubernetes memory quantity: "{memory}".')
+    number, suffix = match.groups()
+    return int(float(number) * _MEMORY_SUFFIXES.get(suffix or "", 1))
+
+
+REANA_KUBERNETES_JOBS_MEMORY_LIMIT = _env("REANA_KUBERNETES_JOBS_MEMORY_LIMIT")
 """Maximum memory limit for user job containers for workflow complexity estimation."""
 
 REANA_KUBERNETES_JOBS_MEMORY_LIMIT_IN_BYTES = (
-    kubernetes_memory_to_bytes(REANA_KUBERNETES_JOBS_MEMORY_LIMIT)
+    _kubernetes_memory_to_bytes(REANA_KUBERNETES_JOBS_MEMORY_LIMIT)
     if REANA_KUBERNETES_JOBS_MEMORY_LIMIT
     else 0
 )
 """Maximum memory limit for user job containers in bytes."""
 
-REANA_KUBERNETES_JOBS_MAX_USER_MEMORY_LIMIT = os.getenv(
+REANA_KUBERNETES_JOBS_MAX_USER_MEMORY_LIMIT = _env(
     "REANA_KUBERNETES_JOBS_MAX_USER_MEMORY_LIMIT"
 )
 """Maximum memory limit that users can assign to their job containers."""
 
 REANA_KUBERNETES_JOBS_MAX_USER_MEMORY_LIMIT_IN_BYTES = (
-    kubernetes_memory_to_bytes(REANA_KUBERNETES_JOBS_MAX_USER_MEMORY_LIMIT)
+    _kubernetes_memory_to_bytes(REANA_KUBERNETES_JOBS_MAX_USER_MEMORY_LIMIT)
     if REANA_KUBERNETES_JOBS_MAX_USER_MEMORY_LIMIT
     else 0
 )
 """Maximum memory limit that users can assign to their job containers in bytes."""
 
-REANA_WORKFLOW_SCHEDULING_POLICY = os.getenv("REANA_WORKFLOW_SCHEDULING_POLICY", "fifo")
+REANA_WORKFLOW_SCHEDULING_POLICY = _env("REANA_WORKFLOW_SCHEDULING_POLICY", "fifo")
 
 REANA_WORKFLOW_SCHEDULING_POLICIES = ["fifo", "balanced"]
 """REANA workflow scheduling policies.
@@ -66,8 +123,8 @@ REANA_WORKFLOW_SCHEDULING_POLICIES = ["fifo", "balanced"]
 - ``balanced``: a weighted strategy taking into account existing multi-user workloads and the DAG complexity of incoming workflows.
 """
 
-REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL = int(
-    os.getenv("REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL", 9)
+REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL = _env(
+    "REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL", 9, cast=int
 )
 """REANA workflow scheduling readiness check needed to assess whether the cluster is ready to start new workflows."""
 
@@ -84,15 +141,32 @@ REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL_VALUE_MAP = {
 - 9 = perform all checks; satisfy all previous criteria.
 """
 
-REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_VALUE = (
-    REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL_VALUE_MAP.get(
-        REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL, "all_checks"
+if (
+    REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL
+    not in REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL_VALUE_MAP
+):
+    raise ValueError(
+        "REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL must be one of {0}, got {1}.".format(
+            sorted(REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL_VALUE_MAP),
+            REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL,
+        )
     )
+
+REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_VALUE = (
+    REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL_VALUE_MAP[
+        REANA_WORKFLOW_SCHEDULING_READINESS_CHECK_LEVEL
+    ]
 )
 """REANA workflow scheduling readiness check value."""
 
-SUPPORTED_COMPUTE_BACKENDS = json.loads(os.getenv("REANA_COMPUTE_BACKENDS", "[]")) or []
-"""List of supported compute backends."""
+_REANA_COMPUTE_BACKENDS = _env("REANA_COMPUTE_BACKENDS")
+
+SUPPORTED_COMPUTE_BACKENDS = (
+    frozenset(json.loads(_REANA_COMPUTE_BACKENDS))
+    if _REANA_COMPUTE_BACKENDS
+    else frozenset()
+)
+"""Set of supported compute backends."""
 
 REANA_QUOTAS_DOCS_URL = "https://docs.reana.io/advanced-usage/user-quotas"
 
@@ -113,10 +187,6 @@ MAIL_SUPPRESS_SEND = True
 
 # Accounts
 # ========
-#: Redis URL
-ACCOUNTS_SESSION_REDIS_URL = "redis://{host}:6379/1".format(
-    host=REANA_INFRASTRUCTURE_COMPONENTS_HOSTNAMES["cache"]
-)
 #: Email address used as sender of account registration emails.
 SECURITY_EMAIL_SENDER = SUPPORT_EMAIL
 #: Email subject for account registration emails.
@@ -129,8 +199,8 @@ SECURITY_EMAIL_SUBJECT_REGISTER = _("Welcome to REANA Server!")
 ACCOUNTS_USERINFO_HEADERS = True
 #: Disable password recovery by users.
 SECURITY_RECOVERABLE = False
-REANA_USER_EMAIL_CONFIRMATION = strtobool(
-    os.getenv("REANA_USER_EMAIL_CONFIRMATION", "true")
+REANA_USER_EMAIL_CONFIRMATION = _env(
+    "REANA_USER_EMAIL_CONFIRMATION", True, cast=_strtobool
 )
 #: Enable user to confirm their email address.
 SECURITY_CONFIRMABLE = REANA_USER_EMAIL_CONFIRMATION
@@ -144,7 +214,12 @@ SECURITY_LOGIN_URL = "/signin"
 #: Disable password change by users.
 SECURITY_CHANGEABLE = False
 #: Modify sign in validaiton error to avoid leaking extra information.
-failed_signin_msg = ("Signin failed. Invalid user or password.", "error")
+#: The strings are interned so that every SECURITY_MSG_* entry shares the
+#: same objects and comparisons stay on the fast identity path.
+failed_signin_msg = (
+    sys.intern("Signin failed. Invalid user or password."),
+    sys.intern("error"),
+)
 SECURITY_MSG_USER_DOES_NOT_EXIST = failed_signin_msg
 SECURITY_MSG_PASSWORD_NOT_SET = failed_signin_msg
 SECURITY_MSG_INVALID_PASSWORD = failed_signin_msg
@@ -182,19 +257,23 @@ if REANA_HOSTNAME:
 # Security configuration
 # ======================
 PROXYFIX_CONFIG = {"x_proto": 1}
-APP_DEFAULT_SECURE_HEADERS["content_security_policy"] = {}
 APP_HEALTH_BLUEPRINT_ENABLED = False
 
 # Rate limiting configuration using invenio-app
 # ===========================
 
+_PARSED_RATE_LIMITS = {}
+"""Rate-limit strings parsed once into ``limits.RateLimitItem`` objects."""
 
+
+@functools.lru_cache(maxsize=None)
 def _get_rate_limit(env_variable: str, default: str) -> str:
-    env_value = os.getenv(env_variable, "")
+    env_value = _ENV.get(env_variable, "")
     try:
-        parse(env_value)
+        _PARSED_RATE_LIMITS[env_value] = parse(env_value)
         return env_value
     except ValueError:
+        _PARSED_RATE_LIMITS.setdefault(default, parse(default))
         return default
 
 
@@ -209,6 +288,17 @@ RATELIMIT_PER_ENDPOINT = {
     "launch.launch": REANA_RATELIMIT_SLOW,
 }
 
+RATELIMIT_PER_ENDPOINT_PARSED = {
+    endpoint: _PARSED_RATE_LIMITS[value]
+    for endpoint, value in RATELIMIT_PER_ENDPOINT.items()
+}
+"""Per-endpoint rate limits pre-parsed into ``limits.RateLimitItem`` objects.
+
+Invenio consumes the string form from ``RATELIMIT_PER_ENDPOINT``; consumers
+that accept the compiled form can use this mapping and skip re-parsing on
+the request hot path.
+"""
+
 # Flask-Breadcrumbs needs this variable set
 # =========================================
 BREADCRUMBS_ROOT = "breadcrumbs"
@@ -217,25 +307,8 @@ BREADCRUMBS_ROOT = "breadcrumbs"
 # ===================
 OAUTH_REDIRECT_URL = "/signin_callback"
 
-OAUTH_REMOTE_REST_APP = copy.deepcopy(cern_openid.REMOTE_REST_APP)
-
-OAUTH_REMOTE_REST_APP.update(
-    {
-        "authorized_redirect_url": OAUTH_REDIRECT_URL,
-        "error_redirect_url": OAUTH_REDIRECT_URL,
-    }
-)
-
 OAUTHCLIENT_REST_DEFAULT_ERROR_REDIRECT_URL = OAUTH_REDIRECT_URL
 
-OAUTHCLIENT_REMOTE_APPS = dict(
-    cern_openid=OAUTH_REMOTE_REST_APP,
-)
-
-OAUTHCLIENT_REST_REMOTE_APPS = dict(
-    cern_openid=OAUTH_REMOTE_REST_APP,
-)
-
 CERN_APP_OPENID_CREDENTIALS = dict(
     consumer_key=REANA_SSO_CERN_CONSUMER_KEY,
     consumer_secret=REANA_SSO_CERN_CONSUMER_SECRET,
@@ -249,60 +322,153 @@ SECURITY_SEND_REGISTER_EMAIL = False
 
 # Gitlab Application configuration
 # ================================
-REANA_GITLAB_OAUTH_APP_ID = os.getenv("REANA_GITLAB_OAUTH_APP_ID", "CHANGE_ME")
-REANA_GITLAB_OAUTH_APP_SECRET = os.getenv("REANA_GITLAB_OAUTH_APP_SECRET", "CHANGE_ME")
-REANA_GITLAB_URL = "https://{}".format(os.getenv("REANA_GITLAB_HOST", "CHANGE_ME"))
+REANA_GITLAB_OAUTH_APP_ID = _env("REANA_GITLAB_OAUTH_APP_ID", "CHANGE_ME")
+REANA_GITLAB_OAUTH_APP_SECRET = _env("REANA_GITLAB_OAUTH_APP_SECRET", "CHANGE_ME")
+REANA_GITLAB_URL = "https://{}".format(_env("REANA_GITLAB_HOST", "CHANGE_ME"))
 
 
 # Email configuration
 # ===================
-ADMIN_EMAIL = os.getenv("REANA_EMAIL_SENDER", "CHANGE_ME")
+ADMIN_EMAIL = _env("REANA_EMAIL_SENDER", "CHANGE_ME")
 
 
 # Workflow scheduler
 # ==================
-REANA_SCHEDULER_REQUEUE_SLEEP = float(os.getenv("REANA_SCHEDULER_REQUEUE_SLEEP", "15"))
+REANA_SCHEDULER_REQUEUE_SLEEP = _env("REANA_SCHEDULER_REQUEUE_SLEEP", 15.0, cast=float)
 """How many seconds to wait between consuming workflows."""
 
-REANA_SCHEDULER_REQUEUE_COUNT = float(os.getenv("REANA_SCHEDULER_REQUEUE_COUNT", "200"))
+REANA_SCHEDULER_REQUEUE_COUNT = _env("REANA_SCHEDULER_REQUEUE_COUNT", 200.0, cast=float)
 """How many times to requeue workflow, in case of error or busy cluster, before failing it."""
 
 # Workflow fetcher
 # ================
-WORKFLOW_SPEC_FILENAMES = ["reana.yaml", "reana.yml"]
+WORKFLOW_SPEC_FILENAMES = ("reana.yaml", "reana.yml")
 """Filenames to use when discovering workflow specifications."""
 
-WORKFLOW_SPEC_EXTENSIONS = [".yaml", ".yml"]
+WORKFLOW_SPEC_EXTENSIONS = (".yaml", ".yml")
 """Valid file extensions of workflow specifications."""
 
-REGEX_CHARS_TO_REPLACE = re.compile("[^a-zA-Z0-9_]+")
+try:
+    # Optional DFA-backed regex engine without backtracking.
+    import re2 as _regex_engine
+except ImportError:
+    _regex_engine = re
+
+REGEX_CHARS_TO_REPLACE = _regex_engine.compile("[^a-zA-Z0-9_]+")
 """Regex matching groups of characters that need to be replaced in workflow names."""
 
 FETCHER_MAXIMUM_FILE_SIZE = 1024**3  # 1 GB
 """Maximum file size allowed when fetching workflow specifications."""
 
-FETCHER_ALLOWED_SCHEMES = ["https", "http"]
+FETCHER_ALLOWED_SCHEMES = frozenset({"https", "http"})
 """Schemes allowed when fetching workflow specifications."""
 
 FETCHER_REQUEST_TIMEOUT = 60
 """Timeout used when fetching workflow specifications."""
 
-FETCHER_ALLOWED_GITLAB_HOSTNAMES = ["gitlab.com", "gitlab.cern.ch"]
+FETCHER_ALLOWED_GITLAB_HOSTNAMES = frozenset({"gitlab.com", "gitlab.cern.ch"})
 """GitLab instances allowed when fetching workflow specifications."""
 
-LAUNCHER_ALLOWED_SNAKEMAKE_URLS = [
-    "https://github.com/reanahub/reana-demo-cms-h4l",
-    "https://github.com/reanahub/reana-demo-helloworld",
-    "https://github.com/reanahub/reana-demo-root6-roofit",
-    "https://github.com/reanahub/reana-demo-worldpopulation",
-]
+LAUNCHER_ALLOWED_SNAKEMAKE_URLS = frozenset(
+    {
+        "https://github.com/reanahub/reana-demo-cms-h4l",
+        "https://github.com/reanahub/reana-demo-helloworld",
+        "https://github.com/reanahub/reana-demo-root6-roofit",
+        "https://github.com/reanahub/reana-demo-worldpopulation",
+    }
+)
 """Allowed URLs when launching a Snakemake workflow."""
 
 # Workspace retention rules
 # ==================
 
-WORKSPACE_RETENTION_PERIOD = int(os.getenv("WORKSPACE_RETENTION_PERIOD", "365"))
+WORKSPACE_RETENTION_PERIOD = _env("WORKSPACE_RETENTION_PERIOD", 365, cast=int)
 """Maximum allowed period for workspace retention rules."""
 
 DEFAULT_WORKSPACE_RETENTION_RULE = "**/*"
 """Workspace retention rule which will be applied to all the workflows by default."""
+
+# Lazily-resolved configuration
+# =============================
+# The following configuration values need imports of heavy dependency trees
+# (Invenio, SQLAlchemy, Kubernetes helpers) that dominate the cold-start time
+# of CLI entrypoints and tests needing only a subset of the constants. They
+# are resolved on first attribute access (PEP 562) and cached in the module
+# globals afterwards.
+
+
+def _resolve(name):
+    """Return an already-resolved lazy value or resolve it now."""
+    try:
+        return globals()[name]
+    except KeyError:
+        return __getattr__(name)
+
+
+def _lazy_sqlalchemy_database_uri():
+    # This database URI import is necessary for Invenio-DB
+    from reana_db.config import SQLALCHEMY_DATABASE_URI
+
+    return SQLALCHEMY_DATABASE_URI
+
+
+def _lazy_accounts_session_redis_url():
+    #: Redis URL
+    from reana_commons.config import REANA_INFRASTRUCTURE_COMPONENTS_HOSTNAMES
+
+    return "redis://{host}:6379/1".format(
+        host=REANA_INFRASTRUCTURE_COMPONENTS_HOSTNAMES["cache"]
+    )
+
+
+def _lazy_app_default_secure_headers():
+    from invenio_app.config import APP_DEFAULT_SECURE_HEADERS
+
+    # Override on a local copy so that the dict shared by every other
+    # consumer of invenio_app.config is not mutated in place.
+    return {**APP_DEFAULT_SECURE_HEADERS, "content_security_policy": {}}
+
+
+def _lazy_oauth_remote_rest_app():
+    from invenio_oauthclient.contrib import cern_openid
+
+    # Shallow merge: only two top-level keys are overridden and the nested
+    # dicts are never mutated, so a recursive deepcopy is not needed.
+    return {
+        **cern_openid.REMOTE_REST_APP,
+        "authorized_redirect_url": OAUTH_REDIRECT_URL,
+        "error_redirect_url": OAUTH_REDIRECT_URL,
+    }
+
+
+def _lazy_oauthclient_remote_apps():
+    # A single read-only view shared by both OAUTHCLIENT_* settings: no
+    # accidental mutation, no duplicate dict allocation.
+    apps = MappingProxyType(dict(cern_openid=_resolve("OAUTH_REMOTE_REST_APP")))
+    globals()["OAUTHCLIENT_REMOTE_APPS"] = apps
+    globals()["OAUTHCLIENT_REST_REMOTE_APPS"] = apps
+    return apps
+
+
+_LAZY_CONFIG_VALUES = {
+    "SQLALCHEMY_DATABASE_URI": _lazy_sqlalchemy_database_uri,
+    "ACCOUNTS_SESSION_REDIS_URL": _lazy_accounts_session_redis_url,
+    "APP_DEFAULT_SECURE_HEADERS": _lazy_app_default_secure_headers,
+    "OAUTH_REMOTE_REST_APP": _lazy_oauth_remote_rest_app,
+    "OAUTHCLIENT_REMOTE_APPS": _lazy_oauthclient_remote_apps,
+    "OAUTHCLIENT_REST_REMOTE_APPS": _lazy_oauthclient_remote_apps,
+}
+
+
+def __getattr__(name):
+    """Resolve lazy configuration values on first access (PEP 562)."""
+    if name in _LAZY_CONFIG_VALUES:
+        value = _LAZY_CONFIG_VALUES[name]()
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """Advertise lazy configuration values, e.g. to ``Config.from_object``."""
+    return sorted(set(globals()) | set(_LAZY_CONFIG_VALUES))
@@ -22,6 +22,7 @@ from reana_server.utils import (
     _get_user_from_invenio_user,
     get_user_from_token,
     get_quota_excess_message,
+    get_secrets_store,
 )
 
 
@@ -68,6 +69,26 @@ def signin_required(include_gitlab_login=False):
     return decorator
 
 
+def with_secrets_store(func):
+    """Resolve the user's secrets store once and inject it into the view.
+
+    Must be applied after ``signin_required`` so that the ``user`` keyword
+    argument is already resolved.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            kwargs["secrets_store"] = get_secrets_store(kwargs["user"].id_)
+        except Exception as e:
+            logging.error(traceback.format_exc())
+            return jsonify({"message": str(e)}), 500
+
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
 def check_quota(func):
     """Check user quota usage and prevent the function from running if exceeded."""
 
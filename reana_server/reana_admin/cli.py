@@ -46,6 +46,7 @@ from reana_server.status import STATUS_OBJECT_TYPES
 from reana_server.utils import (
     _create_user,
     _export_users,
+    _get_admin_access_token,
     _get_user_by_criteria,
     _get_users,
     _import_users,
@@ -248,6 +249,8 @@ def token_grant(admin_access_token, id_, email):
         user_granted_token = secrets.token_urlsafe(16)
         user.access_token = user_granted_token
         Session.commit()
+        if str(user.id_) == ADMIN_USER_ID:
+            _get_admin_access_token.cache_clear()
         log_msg = (
             f"Token for user {user.id_} ({user.email}) granted.\n"
             f"\nToken: {user_granted_token}"
@@ -308,6 +311,8 @@ def token_revoke(admin_access_token, id_, email):
         revoked_token = user.access_token
         user.active_token.status = UserTokenStatus.revoked
         Session.commit()
+        if str(user.id_) == ADMIN_USER_ID:
+            _get_admin_access_token.cache_clear()
         log_msg = (
             f"User token {revoked_token} ({user.email}) was" " successfully revoked."
         )
@@ -36,6 +36,9 @@ from reana_server.decorators import signin_required
 from reana_server.utils import (
     _format_gitlab_secrets,
     _get_gitlab_hook_id,
+    _gitlab_session,
+    GITLAB_REQUEST_TIMEOUT,
+    invalidate_secrets_store,
 )
 
 
@@ -159,13 +162,16 @@ def gitlab_oauth(user):  # noqa
                 "code": gitlab_code,
                 "grant_type": "authorization_code",
             }
-            gitlab_response = requests.post(
-                REANA_GITLAB_URL + "/oauth/token", data=params
-            ).content
+            gitlab_response = _gitlab_session.post(
+                REANA_GITLAB_URL + "/oauth/token",
+                data=params,
+                timeout=GITLAB_REQUEST_TIMEOUT,
+            ).json()
             secrets_store = REANAUserSecretsStore(str(user.id_))
             secrets_store.add_secrets(
                 _format_gitlab_secrets(gitlab_response), overwrite=True
             )
+            invalidate_secrets_store(user.id_)
             return redirect(next_url), 201
         else:
             return jsonify({"message": "OK"}), 200
@@ -212,7 +218,10 @@ def gitlab_projects(user):  # noqa
         gitlab_token = secrets_store.get_secret_value("gitlab_access_token")
         gitlab_user = secrets_store.get_secret_value("gitlab_user")
         gitlab_url = REANA_GITLAB_URL + "/api/v4/users/{0}/projects?access_token={1}"
-        response = requests.get(gitlab_url.format(gitlab_user, gitlab_token))
+        response = _gitlab_session.get(
+            gitlab_url.format(gitlab_user, gitlab_token),
+            timeout=GITLAB_REQUEST_TIMEOUT,
+        )
         projects = dict()
         if response.status_code == 200:
             for gitlab_project in response.json():
@@ -333,9 +342,10 @@ def gitlab_webhook(user):  # noqa
                 "enable_ssl_verification": False,
                 "token": user.access_token,
             }
-            webhook = requests.post(
+            webhook = _gitlab_session.post(
                 gitlab_url.format(parameters["project_id"], gitlab_token),
                 data=webhook_payload,
+                timeout=GITLAB_REQUEST_TIMEOUT,
             )
             return jsonify({"id": webhook.json()["id"]}), 201
         elif request.method == "DELETE":
@@ -344,10 +354,11 @@ def gitlab_webhook(user):  # noqa
                 + "/api/v4/projects/"
                 + "{0}/hooks/{1}?access_token={2}"
             )
-            resp = requests.delete(
+            resp = _gitlab_session.delete(
                 gitlab_url.format(
                     parameters["project_id"], parameters["hook_id"], gitlab_token
-                )
+                ),
+                timeout=GITLAB_REQUEST_TIMEOUT,
             )
             return resp.content, resp.status_code
 
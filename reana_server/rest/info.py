@@ -108,7 +108,7 @@ def info(user, **kwargs):  # noqa
             ),
             compute_backends=dict(
                 title="List of supported compute backends",
-                value=SUPPORTED_COMPUTE_BACKENDS,
+                value=sorted(SUPPORTED_COMPUTE_BACKENDS),
             ),
         )
         return InfoSchema().dump(info)
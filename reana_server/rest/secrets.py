@@ -8,23 +8,51 @@
 
 """Reana-Server User Endpoints."""
 
-import json
 import logging
-import traceback
 
 from flask import Blueprint, jsonify, request
 from reana_commons.errors import REANASecretAlreadyExists, REANASecretDoesNotExist
-from reana_commons.k8s.secrets import REANAUserSecretsStore
 
-from reana_server.decorators import signin_required
+from reana_server.decorators import signin_required, with_secrets_store
+from reana_server.utils import invalidate_secrets_store
 
 
+logger = logging.getLogger(__name__)
+
 blueprint = Blueprint("secrets", __name__)
 
 
+_OVERWRITE_VALUES = {"true": True, "1": True, "false": False, "0": False}
+"""Accepted values of the boolean ``overwrite`` query argument."""
+
+MAX_SECRETS_PAYLOAD_SIZE = 1024 * 1024  # 1 MB
+"""Maximum accepted size in bytes of the secrets request body."""
+
+MAX_SECRETS_PER_REQUEST = 100
+"""Maximum number of secrets accepted in a single request."""
+
+
+def _check_secrets_payload_limits():
+    """Return an error response if the secrets request body exceeds the limits."""
+    if (request.content_length or 0) > MAX_SECRETS_PAYLOAD_SIZE:
+        return jsonify({"message": "Secrets payload is too large."}), 413
+    if len(request.get_json(cache=True) or []) > MAX_SECRETS_PER_REQUEST:
+        return (
+            jsonify(
+                {
+                    "message": f"Cannot process more than "
+                    f"{MAX_SECRETS_PER_REQUEST} secrets per request."
+                }
+            ),
+            413,
+        )
+    return None
+
+
 @blueprint.route("/secrets/", methods=["POST"])
 @signin_required()
-def add_secrets(user):  # noqa
+@with_secrets_store
+def add_secrets(user, secrets_store):  # noqa
     r"""Endpoint to create user secrets.
 
     ---
@@ -102,6 +130,14 @@ def add_secrets(user):  # noqa
                 "message": "The submitted secrets api_key, password,
                             username already exist."
               }
+        413:
+          description: >-
+            Request failed. Payload is too large.
+          examples:
+            application/json:
+              {
+                "message": "Secrets payload is too large."
+              }
         500:
           description: >-
             Request failed. Internal server error.
@@ -112,22 +148,28 @@ def add_secrets(user):  # noqa
               }
     """
     try:
-        secrets_store = REANAUserSecretsStore(str(user.id_))
-        overwrite = json.loads(request.args.get("overwrite"))
-        secrets_store.add_secrets(request.json, overwrite=overwrite)
+        error_response = _check_secrets_payload_limits()
+        if error_response:
+            return error_response
+        overwrite = _OVERWRITE_VALUES.get(
+            (request.args.get("overwrite") or "").lower(), False
+        )
+        secrets_store.add_secrets(request.get_json(cache=True), overwrite=overwrite)
+        invalidate_secrets_store(user.id_)
         return jsonify({"message": "Secret(s) successfully added."}), 201
     except REANASecretAlreadyExists as e:
         return jsonify({"message": str(e)}), 409
     except ValueError:
         return jsonify({"message": "Token is not valid."}), 403
     except Exception as e:
-        logging.error(traceback.format_exc())
+        logger.exception("Secrets endpoint failure")
         return jsonify({"message": str(e)}), 500
 
 
 @blueprint.route("/secrets", methods=["GET"])
 @signin_required()
-def get_secrets(user):  # noqa
+@with_secrets_store
+def get_secrets(user, secrets_store):  # noqa
     r"""Endpoint to retrieve user secrets.
 
     ---
@@ -194,19 +236,19 @@ def get_secrets(user):  # noqa
               }
     """
     try:
-        secrets_store = REANAUserSecretsStore(str(user.id_))
         user_secrets = secrets_store.get_secrets()
         return jsonify(user_secrets), 200
     except ValueError:
         return jsonify({"message": "Token is not valid."}), 403
     except Exception as e:
-        logging.error(traceback.format_exc())
+        logger.exception("Secrets endpoint failure")
         return jsonify({"message": str(e)}), 500
 
 
 @blueprint.route("/secrets/", methods=["DELETE"])
 @signin_required()
-def delete_secrets(user):  # noqa
+@with_secrets_store
+def delete_secrets(user, secrets_store):  # noqa
     r"""Endpoint to delete user secrets.
 
     ---
@@ -273,6 +315,14 @@ def delete_secrets(user):  # noqa
                 "certificate.pem",
                 "PASSWORD",
               ]
+        413:
+          description: >-
+            Request failed. Payload is too large.
+          examples:
+            application/json:
+              {
+                "message": "Secrets payload is too large."
+              }
         500:
           description: >-
             Request failed. Internal server error.
@@ -283,13 +333,18 @@ def delete_secrets(user):  # noqa
               }
     """
     try:
-        secrets_store = REANAUserSecretsStore(str(user.id_))
-        deleted_secrets_list = secrets_store.delete_secrets(request.json)
+        error_response = _check_secrets_payload_limits()
+        if error_response:
+            return error_response
+        deleted_secrets_list = secrets_store.delete_secrets(
+            request.get_json(cache=True)
+        )
+        invalidate_secrets_store(user.id_)
         return jsonify(deleted_secrets_list), 200
     except REANASecretDoesNotExist as e:
         return jsonify(e.missing_secrets_list), 404
     except ValueError:
         return jsonify({"message": "Token is not valid."}), 403
     except Exception as e:
-        logging.error(traceback.format_exc())
+        logger.exception("Secrets endpoint failure")
         return jsonify({"message": str(e)}), 500
@@ -9,22 +9,42 @@
 
 import base64
 import csv
+import errno
+import functools
+import hmac
 import io
-import json
+import itertools
 import logging
 import os
 import pathlib
+import re
 import secrets
 import sys
 import shutil
+import threading
 from typing import Dict, List, Optional, Union
-from uuid import UUID, uuid4
+from uuid import uuid4
 
 import click
 import requests
 import yaml
-from flask import url_for
-from jinja2 import Environment, PackageLoader, select_autoescape
+
+try:
+    # LibYAML-backed loader, much faster than the pure-Python one.
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import g, has_request_context, url_for
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    PackageLoader,
+    select_autoescape,
+)
 from marshmallow.exceptions import ValidationError
 from marshmallow.validate import Email
 from urllib import parse as urlparse
@@ -32,7 +52,6 @@ from urllib import parse as urlparse
 from reana_commons.config import REANAConfig, REANA_WORKFLOW_UMASK, SHARED_VOLUME_PATH
 from reana_commons.email import send_email
 from reana_commons.errors import REANAQuotaExceededError, REANAValidationError
-from reana_commons.k8s.secrets import REANAUserSecretsStore
 from reana_commons.utils import get_quota_resource_usage
 from reana_commons.yadage import yadage_load_from_workspace
 from reana_db.database import Session
@@ -42,6 +61,7 @@ from reana_db.models import (
     RunStatus,
     User,
     UserResource,
+    UserToken,
     UserTokenStatus,
     UserTokenType,
     Workflow,
@@ -53,6 +73,7 @@ from sqlalchemy.exc import (
     SQLAlchemyError,
     StatementError,
 )
+from sqlalchemy.orm.attributes import flag_modified
 
 from reana_server.api_client import current_workflow_submission_publisher
 from reana_server.complexity import (
@@ -75,15 +96,15 @@ from reana_server.config import (
 from reana_server.validation import validate_retention_rule
 
 
+_UUID4_RE = re.compile(
+    r"\A[0-9a-f]{8}-?[0-9a-f]{4}-?4[0-9a-f]{3}-?[89ab][0-9a-f]{3}-?[0-9a-f]{12}\Z"
+)
+"""Compiled pattern matching canonical lowercase UUIDv4 strings."""
+
+
 def is_uuid_v4(uuid_or_name):
     """Check if given string is a valid UUIDv4."""
-    # Based on https://gist.github.com/ShawnMilo/7777304
-    try:
-        uuid = UUID(uuid_or_name, version=4)
-    except Exception:
-        return False
-
-    return uuid.hex == uuid_or_name.replace("-", "")
+    return bool(_UUID4_RE.match(uuid_or_name))
 
 
 def create_user_workspace(user_workspace_path):
@@ -108,16 +129,26 @@ def get_quota_excess_message(user) -> str:
     :param user: User whose quota needs to be checked.
     """
     quota = user.get_quota_usage()
-    message = "User quota exceeded.\n"
+    parts = ["User quota exceeded."]
     for resource_type, resource in quota.items():
         limit = resource.get("limit", {}).get("raw", 0)
         usage = resource.get("usage", {}).get("raw", 0)
         if 0 < limit <= usage:
             resource_usage, _ = get_quota_resource_usage(resource, "human_readable")
-            message += f"Resource: {resource_type}, usage: {resource_usage}\n"
+            parts.append(f"Resource: {resource_type}, usage: {resource_usage}")
+
+    parts.append(f"Please see: {REANA_QUOTAS_DOCS_URL}")
+    return "\n".join(parts)
 
-    message += f"Please see: {REANA_QUOTAS_DOCS_URL}"
-    return message
+
+@functools.lru_cache(maxsize=None)
+def _get_disk_resource_id():
+    """Return the default disk quota resource id, cached for the process lifetime.
+
+    The id is cached rather than the ORM object so that the cached value
+    stays valid across sessions.
+    """
+    return get_default_quota_resource(ResourceType.disk.name).id_
 
 
 def prevent_disk_quota_excess(user, bytes_to_sum: int, action=Optional[str]):
@@ -130,9 +161,8 @@ def prevent_disk_quota_excess(user, bytes_to_sum: int, action=Optional[str]):
     :param bytes_to_sum: Bytes to be added to the user's quota.
     :param action: Optional action description used for custom error messages.
     """
-    disk_resource = get_default_quota_resource(ResourceType.disk.name)
     user_resource = UserResource.query.filter_by(
-        user_id=user.id_, resource_id=disk_resource.id_
+        user_id=user.id_, resource_id=_get_disk_resource_id()
     ).first()
     if (
         user_resource.quota_limit > 0
@@ -157,18 +187,25 @@ def remove_fetched_workflows_dir(tmpdir: str) -> None:
 
 def mv_workflow_files(source: str, target: str) -> None:
     """Move files from one directory to another."""
-    for entry in os.listdir(source):
-        shutil.move(os.path.join(source, entry), target)
+    with os.scandir(source) as entries:
+        for entry in entries:
+            target_path = os.path.join(target, entry.name)
+            try:
+                # Same-filesystem move: a single rename syscall.
+                os.replace(entry.path, target_path)
+            except OSError as error:
+                if error.errno != errno.EXDEV:
+                    raise
+                # Cross-device move: fall back to copy-and-delete.
+                shutil.move(entry.path, target_path)
 
 
 # FIXME: use `is_relative_to` from the standard library when moving to Python 3.9
 def is_relative_to(path: pathlib.Path, base: pathlib.Path) -> bool:
     """Check whether `path` is contained inside `base`."""
-    try:
-        path.relative_to(base)
-        return True
-    except ValueError:
-        return False
+    p = os.fspath(path)
+    b = os.fspath(base)
+    return p == b or p.startswith(b + os.sep)
 
 
 def filter_input_files(workspace: Union[str, pathlib.Path], reana_spec: Dict) -> None:
@@ -194,42 +231,113 @@ def filter_input_files(workspace: Union[str, pathlib.Path], reana_spec: Dict) ->
         if not directory_path.exists():
             raise REANAValidationError(f"Input directory not found: {directory}")
 
-    paths = [pathlib.Path(path) for path in files + directories]
-    filtered = workspace / f"filtered-{uuid4()}"
-    filtered.mkdir()
-
-    # Move input files to the temporary `filtered` directory
-    for path in paths:
-        full_source_path = workspace / path
-        full_target_path = filtered / path
-        # Create target directory if it does not exist
-        full_target_path.parent.mkdir(parents=True, exist_ok=True)
-        full_source_path.replace(full_target_path)
-
-    # Delete remaining files in the workspace
-    for path in workspace.iterdir():
-        if path == filtered:
-            continue
-        if path.is_file() or path.is_symlink():
-            path.unlink()
-        else:
-            shutil.rmtree(path)
+    # Inputs are kept with their whole subtree; their ancestor directories
+    # must survive as well so that the inputs stay reachable.
+    keep = {workspace / path for path in files + directories}
+    ancestors = set()
+    for path in keep:
+        ancestors.update(path.parents)
+
+    # Single top-down traversal deleting in place: prune kept subtrees,
+    # descend into ancestors of kept paths, remove everything else.
+    for dirpath, dirnames, filenames in os.walk(workspace):
+        current_dir = pathlib.Path(dirpath)
+        for filename in filenames:
+            file_path = current_dir / filename
+            if file_path not in keep:
+                file_path.unlink()
+        for dirname in list(dirnames):
+            dir_path = current_dir / dirname
+            if dir_path in keep:
+                # Input directory: keep its whole subtree.
+                dirnames.remove(dirname)
+            elif dir_path not in ancestors:
+                if dir_path.is_symlink():
+                    dir_path.unlink()
+                else:
+                    shutil.rmtree(dir_path)
+                dirnames.remove(dirname)
+
+
+_secrets_store_cache = TTLCache(maxsize=4096, ttl=30)
+"""Short-lived cache of per-user secrets stores to avoid repeated Kubernetes calls."""
+
+_secrets_store_lock = threading.Lock()
+
+
+def get_secrets_store(user_id):
+    """Return the secrets store of the given user, cached for a short time window."""
+    # Imported lazily so that the Kubernetes client is only loaded by
+    # processes that actually access user secrets.
+    from reana_commons.k8s.secrets import REANAUserSecretsStore
+
+    user_id = str(user_id)
+    with _secrets_store_lock:
+        store = _secrets_store_cache.get(user_id)
+        if store is None:
+            store = REANAUserSecretsStore(user_id)
+            _secrets_store_cache[user_id] = store
+        return store
+
+
+def invalidate_secrets_store(user_id) -> None:
+    """Drop the cached secrets of a user after their secrets change."""
+    with _secrets_store_lock:
+        _secrets_store_cache.pop(str(user_id), None)
+    with _gitlab_token_lock:
+        _gitlab_token_cache.pop(str(user_id), None)
+
+
+_gitlab_session = requests.Session()
+_gitlab_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    ),
+)
+"""Shared HTTP session with connection pooling and keep-alive for GitLab calls."""
+
+GITLAB_REQUEST_TIMEOUT = 60
+"""Timeout used for requests to the GitLab API."""
+
+_gitlab_token_cache = TTLCache(maxsize=1024, ttl=60)
+"""Short-lived cache of GitLab access tokens keyed by user id."""
+
+_gitlab_token_lock = threading.Lock()
+
 
-    # Move the contents of the temporary `filtered` directory to the workspace
-    for path in filtered.iterdir():
-        path.replace(workspace / path.name)
+def _get_gitlab_token(user_id):
+    """Return the GitLab access token of the given user, cached for a minute.
 
-    # Remove temporary `filtered` directory
-    filtered.rmdir()
+    Webhook bursts for the same user would otherwise fetch the token from
+    Kubernetes once per event.
+    """
+    user_id = str(user_id)
+    with _gitlab_token_lock:
+        token = _gitlab_token_cache.get(user_id)
+    if token is None:
+        token = get_secrets_store(user_id).get_secret_value("gitlab_access_token")
+        with _gitlab_token_lock:
+            _gitlab_token_cache[user_id] = token
+    return token
 
 
 def get_user_from_token(access_token):
     """Validate that the token provided is valid."""
-    user = (
-        Session.query(User)
-        .join(User.tokens)
-        .filter_by(token=access_token, type_=UserTokenType.reana)
-    ).one_or_none()
+    if has_request_context():
+        # Authentication decorators may resolve the same token several
+        # times while serving one request, so keep the user on ``g`` to
+        # run the query only once per request.
+        cache = g.setdefault("_user_by_token", {})
+        if access_token in cache:
+            user = cache[access_token]
+        else:
+            user = _query_user_by_token(access_token)
+            cache[access_token] = user
+    else:
+        user = _query_user_by_token(access_token)
     if not user:
         raise ValueError("Token not valid.")
     if user.access_token_status == UserTokenStatus.revoked.name:
@@ -237,6 +345,19 @@ def get_user_from_token(access_token):
     return user
 
 
+def _query_user_by_token(access_token):
+    """Fetch the user owning the given REANA access token."""
+    return (
+        Session.query(User)
+        .join(User.tokens)
+        .filter(
+            UserToken.token == access_token,
+            UserToken.type_ == UserTokenType.reana,
+        )
+        .one_or_none()
+    )
+
+
 def publish_workflow_submission(workflow, user_id, parameters):
     """Publish workflow submission."""
     from reana_server.status import NodesStatus
@@ -272,6 +393,7 @@ def _calculate_complexity(workflow):
     """Place workflow in queue and calculate and set its complexity."""
     complexity = estimate_complexity(workflow.type_, workflow.reana_specification)
     workflow.complexity = complexity
+    flag_modified(workflow, "complexity")
     Session.commit()
     return complexity
 
@@ -285,14 +407,38 @@ def _load_and_save_yadage_spec(workflow: Workflow, operational_options: Dict):
         workflow.reana_specification,
         toplevel,
     )
+    flag_modified(workflow, "reana_specification")
     Session.commit()
 
 
+@functools.lru_cache(maxsize=1)
+def _get_admin_access_token():
+    """Return the admin access token, cached for the lifetime of the process.
+
+    Call ``_get_admin_access_token.cache_clear()`` whenever the admin token
+    is modified.
+    """
+    admin = Session.query(User).filter_by(id_=ADMIN_USER_ID).one()
+    return admin.access_token
+
+
+def _verify_admin_access_token(admin_access_token):
+    """Check the given token against the admin one, in constant time.
+
+    :raises ValueError: in case the token does not match the admin one.
+    """
+    expected_token = _get_admin_access_token()
+    if (
+        not admin_access_token
+        or not expected_token
+        or not hmac.compare_digest(admin_access_token, expected_token)
+    ):
+        raise ValueError("Admin access token invalid.")
+
+
 def _get_users(_id, email, user_access_token, admin_access_token):
     """Return all users matching search criteria."""
-    admin = Session.query(User).filter_by(id_=ADMIN_USER_ID).one_or_none()
-    if admin_access_token != admin.access_token:
-        raise ValueError("Admin access token invalid.")
+    _verify_admin_access_token(admin_access_token)
     search_criteria = dict()
     if _id:
         search_criteria["id_"] = _id
@@ -308,15 +454,12 @@ def _get_users(_id, email, user_access_token, admin_access_token):
 
 def _create_user(email, user_access_token, admin_access_token):
     """Create user with provided credentials."""
+    _verify_admin_access_token(admin_access_token)
+    # Draw from the CSPRNG only once the request is known to be valid.
+    if not user_access_token:
+        user_access_token = secrets.token_urlsafe(16)
     try:
-        admin = Session.query(User).filter_by(id_=ADMIN_USER_ID).one_or_none()
-        if admin_access_token != admin.access_token:
-            raise ValueError("Admin access token invalid.")
-        if not user_access_token:
-            user_access_token = secrets.token_urlsafe(16)
-        user_parameters = dict(access_token=user_access_token)
-        user_parameters["email"] = email
-        user = User(**user_parameters)
+        user = User(email=email, access_token=user_access_token)
         Session.add(user)
         Session.commit()
     except (InvalidRequestError, IntegrityError):
@@ -331,15 +474,16 @@ def _export_users(admin_access_token):
     :param admin_access_token: Admin access token.
     :type admin_access_token: str
     """
-    admin = User.query.filter_by(id_=ADMIN_USER_ID).one_or_none()
-    if admin_access_token != admin.access_token:
-        raise ValueError("Admin access token invalid.")
+    _verify_admin_access_token(admin_access_token)
     csv_file_obj = io.StringIO()
     csv_writer = csv.writer(csv_file_obj, dialect="unix")
-    for user in User.query.all():
-        csv_writer.writerow(
-            [user.id_, user.email, user.access_token, user.username, user.full_name]
-        )
+    # Stream users in batches and serialize them through csv's bulk
+    # writerows path instead of hydrating the whole table upfront and
+    # writing one row at a time.
+    csv_writer.writerows(
+        (user.id_, user.email, user.access_token, user.username, user.full_name)
+        for user in User.query.yield_per(1000)
+    )
     return csv_file_obj
 
 
@@ -351,19 +495,26 @@ def _import_users(admin_access_token, users_csv_file):
     :param users_csv_file: CSV file object containing a list of users.
     :type users_csv_file: _io.TextIOWrapper
     """
-    admin = User.query.filter_by(id_=ADMIN_USER_ID).one_or_none()
-    if admin_access_token != admin.access_token:
-        raise ValueError("Admin access token invalid.")
+    _verify_admin_access_token(admin_access_token)
     csv_reader = csv.reader(users_csv_file)
-    for row in csv_reader:
-        user = User(
-            id_=row[0],
-            email=row[1],
-            access_token=row[2],
-            username=row[3],
-            full_name=row[4],
-        )
-        Session.add(user)
+    # Add users in batches to bound memory usage for very large CSV files
+    # while still issuing a single final commit.
+    batch_size = 1000
+    while True:
+        users = [
+            User(
+                id_=row[0],
+                email=row[1],
+                access_token=row[2],
+                username=row[3],
+                full_name=row[4],
+            )
+            for row in itertools.islice(csv_reader, batch_size)
+        ]
+        if not users:
+            break
+        Session.add_all(users)
+        Session.flush()
     Session.commit()
 
 
@@ -400,12 +551,8 @@ def _create_and_associate_local_user(sender, user, **kwargs):
 
 def _create_and_associate_reana_user(email, fullname, username):
     try:
-        search_criteria = dict()
-        search_criteria["email"] = email
-        users = Session.query(User).filter_by(**search_criteria).all()
-        if users:
-            user = users[0]
-        else:
+        user = Session.query(User).filter_by(email=email).first()
+        if not user:
             user_parameters = dict(email=email, full_name=fullname, username=username)
             user = User(**user_parameters)
             Session.add(user)
@@ -440,14 +587,14 @@ def _get_reana_yaml_from_gitlab(webhook_data, user_id):
     elif webhook_data["object_kind"] == "merge_request":
         branch = webhook_data["object_attributes"]["source_branch"]
         commit_sha = webhook_data["object_attributes"]["last_commit"]["id"]
-    secrets_store = REANAUserSecretsStore(str(user_id))
-    gitlab_token = secrets_store.get_secret_value("gitlab_access_token")
+    gitlab_token = _get_gitlab_token(user_id)
     project_id = webhook_data["project"]["id"]
-    yaml_file = requests.get(
-        gitlab_api.format(project_id, reana_yaml, branch, gitlab_token)
+    yaml_file = _gitlab_session.get(
+        gitlab_api.format(project_id, reana_yaml, branch, gitlab_token),
+        timeout=GITLAB_REQUEST_TIMEOUT,
     )
     return (
-        yaml.load(yaml_file.content, Loader=yaml.FullLoader),
+        yaml.load(yaml_file.content, Loader=YamlSafeLoader),
         webhook_data["project"]["path_with_namespace"],
         webhook_data["project"]["name"],
         branch,
@@ -467,30 +614,33 @@ def _fail_gitlab_commit_build_status(
     git_repo = urlparse.quote_plus(git_repo)
     description = urlparse.quote_plus(description)
 
-    secret_store = REANAUserSecretsStore(user.id_)
-    gitlab_access_token = secret_store.get_secret_value("gitlab_access_token")
+    gitlab_access_token = _get_gitlab_token(user.id_)
     commit_status_url = (
         f"{REANA_GITLAB_URL}/api/v4/projects/{git_repo}/statuses/"
         f"{git_ref}?access_token={gitlab_access_token}&state={state}"
         f"&description={description}&name={system_name}"
     )
-    requests.post(commit_status_url)
+    _gitlab_session.post(commit_status_url, timeout=GITLAB_REQUEST_TIMEOUT)
 
 
 def _format_gitlab_secrets(gitlab_response):
-    access_token = json.loads(gitlab_response)["access_token"]
-    user = json.loads(
-        requests.get(
-            REANA_GITLAB_URL + "/api/v4/user?access_token={0}".format(access_token)
-        ).content
+    access_token = gitlab_response["access_token"]
+    user_response = _gitlab_session.get(
+        REANA_GITLAB_URL + "/api/v4/user",
+        params={"access_token": access_token},
+        timeout=GITLAB_REQUEST_TIMEOUT,
     )
+    user_response.raise_for_status()
+    username = user_response.json()["username"]
+    encoded_token = base64.b64encode(access_token.encode()).decode("ascii")
+    encoded_username = base64.b64encode(username.encode()).decode("ascii")
     return {
         "gitlab_access_token": {
-            "value": base64.b64encode(access_token.encode("utf-8")).decode("utf-8"),
+            "value": encoded_token,
             "type": "env",
         },
         "gitlab_user": {
-            "value": base64.b64encode(user["username"].encode("utf-8")).decode("utf-8"),
+            "value": encoded_username,
             "type": "env",
         },
     }
@@ -505,23 +655,23 @@ def _get_gitlab_hook_id(project_id, gitlab_token):
     :param project_id: Project id on GitLab.
     :param gitlab_token: GitLab token.
     """
-    reana_hook_id = None
-    gitlab_hooks_url = (
-        REANA_GITLAB_URL
-        + "/api/v4/projects/{0}/hooks?access_token={1}".format(project_id, gitlab_token)
+    gitlab_hooks_url = REANA_GITLAB_URL + "/api/v4/projects/{0}/hooks".format(
+        project_id
     )
-    response_json = requests.get(gitlab_hooks_url).json()
     create_workflow_url = url_for("workflows.create_workflow", _external=True)
-    if response_json:
-        reana_hook_id = next(
-            (
-                hook["id"]
-                for hook in response_json
-                if hook["url"] and hook["url"] == create_workflow_url
-            ),
-            None,
+    page = 1
+    while True:
+        response = _gitlab_session.get(
+            gitlab_hooks_url,
+            params={"access_token": gitlab_token, "per_page": 100, "page": page},
+            timeout=GITLAB_REQUEST_TIMEOUT,
         )
-    return reana_hook_id
+        for hook in response.json() or []:
+            if hook["url"] and hook["url"] == create_workflow_url:
+                return hook["id"]
+        if not response.headers.get("X-Next-Page"):
+            return None
+        page += 1
 
 
 class RequestStreamWithLen(object):
@@ -547,6 +697,7 @@ class RequestStreamWithLen(object):
     def __init__(self, limitedstream):
         """Wrap the stream to have ``len``."""
         self.limitedstream = limitedstream
+        self._len = getattr(limitedstream, "limit", 0)
 
     def read(self, *args, **kwargs):
         """Expose ``request.stream``s read method."""
@@ -554,9 +705,7 @@ class RequestStreamWithLen(object):
 
     def __len__(self):
         """Expose the length of the ``request.stream``."""
-        if not hasattr(self.limitedstream, "limit"):
-            return 0
-        return self.limitedstream.limit
+        return self._len
 
 
 def get_workspace_retention_rules(
@@ -567,16 +716,15 @@ def get_workspace_retention_rules(
     :raises reana_commons.errors.REANAValidationError: in case one of the rules is not valid
     """
     retention_rules = []
-    if retention_days:
-        for rule, days in retention_days.items():
-            validate_retention_rule(rule, days)
-            retention_rules.append({"workspace_files": rule, "retention_days": days})
+    has_default_rule = False
+    for rule, days in (retention_days or {}).items():
+        validate_retention_rule(rule, days)
+        retention_rules.append({"workspace_files": rule, "retention_days": days})
+        if rule == DEFAULT_WORKSPACE_RETENTION_RULE:
+            has_default_rule = True
 
     # Insert a default rule in case it's not present
-    if not any(
-        rule["workspace_files"] == DEFAULT_WORKSPACE_RETENTION_RULE
-        for rule in retention_rules
-    ):
+    if not has_default_rule:
         retention_rules.append(
             {
                 "workspace_files": DEFAULT_WORKSPACE_RETENTION_RULE,
@@ -604,9 +752,12 @@ def clone_workflow(workflow, reana_spec, restart_type):
             run_number=workflow.run_number,
         )
         Session.add(cloned_workflow)
-        Session.object_session(cloned_workflow).commit()
+        # Flush so that the clone gets its primary key, but commit only
+        # once the retention rules have been set up as well.
+        Session.flush()
         workflow.inactivate_workspace_retention_rules()
         cloned_workflow.set_workspace_retention_rules(retention_rules)
+        Session.commit()
         return cloned_workflow
     except SQLAlchemyError as e:
         message = "Database connection failed, please retry."
@@ -624,8 +775,8 @@ def _get_user_by_criteria(id_, email):
         elif email:
             criteria["email"] = email
         return User.query.filter_by(**criteria).one_or_none()
-    except StatementError as e:
-        print(e)
+    except StatementError:
+        logging.exception("Could not fetch user by %s", criteria)
         return None
 
 
@@ -661,10 +812,17 @@ class JinjaEnv:
     @staticmethod
     def _get():
         if JinjaEnv._instance is None:
-            JinjaEnv._instance = Environment(
+            env = Environment(
                 loader=PackageLoader("reana_server", "templates"),
                 autoescape=select_autoescape(["html", "xml"]),
+                bytecode_cache=FileSystemBytecodeCache(),
+                auto_reload=False,
             )
+            # Compile all templates upfront so that the first render does
+            # not pay the parsing cost in the request path.
+            for template_name in env.list_templates():
+                env.get_template(template_name)
+            JinjaEnv._instance = env
         return JinjaEnv._instance
 
     @staticmethod
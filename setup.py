@@ -50,6 +50,7 @@ setup_requires = [
 ]
 
 install_requires = [
+    "cachetools>=4.0",
     "gitpython>=3.1",
     "marshmallow>2.13.0,<=2.20.1",
     "pyOpenSSL==17.5.0",
@@ -627,3 +627,43 @@ def test_create_and_associate_local_user(app, session):
     assert user.email == mock_user.email
     assert user.full_name == mock_user.email
     assert user.username == mock_user.email
+
+
+def test_secrets_payload_limits(app, default_user, _get_user_mock):
+    """Test that oversized secrets requests are rejected with 413."""
+    with app.test_client() as client:
+        with patch("reana_server.decorators.get_secrets_store", Mock()):
+            res = client.post(
+                url_for("secrets.add_secrets"),
+                query_string={"access_token": default_user.access_token},
+                content_type="application/json",
+                data=json.dumps({"big_secret": {"value": "x" * 2**21}}),
+            )
+            assert res.status_code == 413
+
+            too_many_secrets = {
+                f"secret{n}": {"value": "dmFsdWU=", "type": "env"} for n in range(101)
+            }
+            res = client.post(
+                url_for("secrets.add_secrets"),
+                query_string={"access_token": default_user.access_token},
+                content_type="application/json",
+                data=json.dumps(too_many_secrets),
+            )
+            assert res.status_code == 413
+
+            res = client.delete(
+                url_for("secrets.delete_secrets"),
+                query_string={"access_token": default_user.access_token},
+                content_type="application/json",
+                data=json.dumps([f"secret{n}" for n in range(101)]),
+            )
+            assert res.status_code == 413
+
+            res = client.post(
+                url_for("secrets.add_secrets"),
+                query_string={"access_token": default_user.access_token},
+                content_type="application/json",
+                data=json.dumps({"api_key": {"value": "dmFsdWU=", "type": "env"}}),
+            )
+            assert res.status_code == 201